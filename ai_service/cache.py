@@ -0,0 +1,110 @@
+"""
+Summary Cache
+Persistent SQLite cache of AI summaries keyed by content hash
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+# Cache policies:
+#   enabled    - read hits, write misses
+#   read-only  - read hits, never write
+#   write-only - always call the model, write results
+#   replay     - read hits, fail on misses (no model calls)
+#   disabled   - bypass the cache entirely
+CACHE_MODES = ('enabled', 'read-only', 'write-only', 'replay', 'disabled')
+
+CACHE_MODE = os.getenv('CACHE_MODE', 'enabled').lower()
+CACHE_PATH = os.getenv('SUMMARY_CACHE_PATH', 'summary_cache.sqlite3')
+
+if CACHE_MODE not in CACHE_MODES:
+    raise ValueError(
+        f"Invalid CACHE_MODE '{CACHE_MODE}'. Expected one of: {', '.join(CACHE_MODES)}"
+    )
+
+# sqlite3 connections can't be shared between threads
+_local = threading.local()
+
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a summary is not cached"""
+
+
+def _connection() -> sqlite3.Connection:
+    """Get the SQLite connection for the calling thread, creating the table on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_PATH, timeout=30)
+        # WAL lets the parallel workers read while another writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, summary TEXT, model TEXT, created_at REAL)'
+        )
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def make_key(text: str, model: str, max_tokens: int) -> str:
+    """
+    Build the cache key for a summarization call
+
+    Args:
+        text: Text being summarized
+        model: Model name
+        max_tokens: Output token limit
+
+    Returns:
+        SHA256 hex digest identifying the call
+    """
+    return hashlib.sha256(f"{model}|{max_tokens}|{text}".encode('utf-8')).hexdigest()
+
+
+def get_summary(key: str) -> Optional[str]:
+    """
+    Look up a cached summary
+
+    Args:
+        key: Cache key from make_key
+
+    Returns:
+        Cached summary, or None if not found or reads are disabled
+
+    Raises:
+        CacheMiss: In replay mode when the key is not cached
+    """
+    if CACHE_MODE in ('disabled', 'write-only'):
+        return None
+
+    row = _connection().execute(
+        'SELECT summary FROM cache WHERE key=?', (key,)
+    ).fetchone()
+
+    if row is None and CACHE_MODE == 'replay':
+        raise CacheMiss(f"No cached summary for key {key} (CACHE_MODE=replay)")
+
+    return row[0] if row else None
+
+
+def set_summary(key: str, summary: str, model: str):
+    """
+    Store a summary in the cache
+
+    Args:
+        key: Cache key from make_key
+        summary: Generated summary
+        model: Model name that produced the summary
+    """
+    if CACHE_MODE not in ('enabled', 'write-only'):
+        return
+
+    conn = _connection()
+    conn.execute(
+        'INSERT OR REPLACE INTO cache (key, summary, model, created_at) VALUES (?, ?, ?, ?)',
+        (key, summary, model, time.time())
+    )
+    conn.commit()
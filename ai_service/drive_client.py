@@ -5,12 +5,16 @@ Handles OAuth authentication and file operations with Google Drive API
 import os
 import io
 import json
+import tempfile
+import threading
+import httplib2
+import google_auth_httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import AuthorizedSession, Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import pickle
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Allow insecure transport for local development (HTTP instead of HTTPS)
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
@@ -18,6 +22,56 @@ os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 # Scopes for Google Drive API
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
+def get_token_path():
+    """Path of the saved OAuth token file"""
+    return os.getenv('GOOGLE_DRIVE_TOKEN_PATH', 'token.json')
+
+
+def save_credentials(creds, token_path):
+    """
+    Atomically write credentials to the token file as JSON
+    
+    Writes to a temporary file first so a crash can't leave a partially
+    written token behind. The file is only readable by the owner.
+    
+    Args:
+        creds: Credentials object to save
+        token_path: Destination token file
+    """
+    # A unique temp name per writer, since the dashboard and the AI service
+    # may both save a token at the same time; mkstemp creates it as 0600
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(token_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(tmp_path, token_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Supported file extensions and their Drive MIME types
+EXT_TO_MIME = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+}
+
+# Default metadata returned by list_files_in_folder
+DEFAULT_LIST_FIELDS = "files(id, name, mimeType, size, createdTime, modifiedTime)"
+
+# Endpoint for downloading raw file content
+DRIVE_MEDIA_URL = 'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
+
+# Read size when streaming downloads into their destination
+DRIVE_CHUNK_BYTES = int(os.getenv('DRIVE_CHUNK_BYTES', str(8 * 1024 * 1024)))
+
+# Pooled connections kept open for downloads; match DRIVE_MAX_IN_FLIGHT
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+
+# Retries for transient network and server errors
+DRIVE_NUM_RETRIES = int(os.getenv('DRIVE_NUM_RETRIES', '10'))
+
 
 class GoogleDriveClient:
     """Client for interacting with Google Drive API"""
@@ -31,6 +85,10 @@ class GoogleDriveClient:
         """
         self.credentials = credentials
         self.service = None
+        # httplib2.Http is not thread-safe, so each thread gets its own
+        self._local = threading.local()
+        self._session = None
+        self._session_lock = threading.Lock()
         if credentials:
             self.service = build('drive', 'v3', credentials=credentials)
         else:
@@ -39,20 +97,18 @@ class GoogleDriveClient:
     def _authenticate(self):
         """Handle OAuth 2.0 authentication flow using environment variables"""
         creds = None
-        token_path = os.getenv('GOOGLE_DRIVE_TOKEN_PATH', 'token.pickle')
+        token_path = get_token_path()
         
         # Load saved credentials if available
         if os.path.exists(token_path):
-            with open(token_path, 'rb') as token:
-                creds = pickle.load(token)
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
         
         # Refresh or get new credentials if needed
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
                 # Save refreshed credentials
-                with open(token_path, 'wb') as token:
-                    pickle.dump(creds, token)
+                save_credentials(creds, token_path)
             else:
                 # Need to initiate OAuth flow
                 raise Exception(
@@ -62,6 +118,58 @@ class GoogleDriveClient:
         self.credentials = creds
         self.service = build('drive', 'v3', credentials=creds)
     
+    def _thread_http(self):
+        """
+        Get an authorized HTTP transport owned by the calling thread
+        
+        Returns:
+            AuthorizedHttp instance for the current thread
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+    
+    def _media_session(self):
+        """
+        Get the shared session used for file downloads
+        
+        Returns:
+            AuthorizedSession with connection pooling and retries
+        """
+        with self._session_lock:
+            if self._session is None:
+                session = AuthorizedSession(self.credentials)
+                retries = Retry(
+                    total=DRIVE_NUM_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504]
+                )
+                session.mount('https://', HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_SIZE,
+                    max_retries=retries
+                ))
+                self._session = session
+            return self._session
+    
+    def _stream_media(self, file_id: str, sink):
+        """
+        Stream a file's content from Google Drive into a writable object
+        
+        Args:
+            file_id: Google Drive file ID
+            sink: Object with a write() method receiving the bytes
+        """
+        url = DRIVE_MEDIA_URL.format(file_id=file_id)
+        # Documents are mostly already compressed, skip gzip on the wire
+        headers = {'Accept-Encoding': 'identity'}
+        with self._media_session().get(url, headers=headers, stream=True, timeout=300) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=DRIVE_CHUNK_BYTES):
+                sink.write(chunk)
+    
     @staticmethod
     def create_oauth_flow(redirect_uri=None):
         """
@@ -137,49 +245,59 @@ class GoogleDriveClient:
         creds = flow.credentials
         
         # Save credentials for future use
-        token_path = os.getenv('GOOGLE_DRIVE_TOKEN_PATH', 'token.pickle')
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
+        save_credentials(creds, get_token_path())
         
         return creds
     
-    def list_files_in_folder(self, folder_id: str, file_types: list = None):
+    def list_files_in_folder(self, folder_id: str, file_types: list = None,
+                             fields: str = DEFAULT_LIST_FIELDS):
         """
         List files in a Google Drive folder
         
         Args:
             folder_id: Google Drive folder ID
             file_types: List of file extensions to filter (e.g., ['pdf', 'docx'])
+            fields: Drive partial-response selector for the file list
             
         Returns:
             List of file metadata dictionaries
+            
+        Raises:
+            ValueError: If any requested file type is not supported
         """
+        # Reject unknown types rather than silently listing every file
+        unsupported = [ext for ext in (file_types or []) if ext.lower() not in EXT_TO_MIME]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported file types: {', '.join(unsupported)}. "
+                f"Supported: {', '.join(EXT_TO_MIME)}"
+            )
+        
         try:
             # Build query
             query = f"'{folder_id}' in parents and trashed=false"
             
             # Add file type filter if specified
             if file_types:
-                mime_types = []
-                for ext in file_types:
-                    if ext.lower() == 'pdf':
-                        mime_types.append("mimeType='application/pdf'")
-                    elif ext.lower() == 'docx':
-                        mime_types.append("mimeType='application/vnd.openxmlformats-officedocument.wordprocessingml.document'")
-                    elif ext.lower() == 'txt':
-                        mime_types.append("mimeType='text/plain'")
-                
-                if mime_types:
-                    query += " and (" + " or ".join(mime_types) + ")"
+                mime_types = [f"mimeType='{EXT_TO_MIME[ext.lower()]}'" for ext in file_types]
+                query += " and (" + " or ".join(mime_types) + ")"
             
-            # Execute API call
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, mimeType, size, createdTime, modifiedTime)",
-                pageSize=100
-            ).execute()
+            # Page through results using the API maximum page size
+            files = []
+            page_token = None
+            while True:
+                results = self.service.files().list(
+                    q=query,
+                    fields=f"nextPageToken, {fields}",
+                    pageSize=1000,
+                    pageToken=page_token
+                ).execute(http=self._thread_http())
+                
+                files.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
             
-            files = results.get('files', [])
             return files
             
         except Exception as e:
@@ -205,19 +323,33 @@ class GoogleDriveClient:
             file_path = os.path.join(download_dir, file_name)
             
             # Download file
-            request = self.service.files().get_media(fileId=file_id)
-            fh = io.FileIO(file_path, 'wb')
-            downloader = MediaIoBaseDownload(fh, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            with io.FileIO(file_path, 'wb') as fh:
+                self._stream_media(file_id, fh)
             
             return file_path
             
         except Exception as e:
             raise Exception(f"Error downloading file {file_name}: {str(e)}")
     
+    def download_to_buffer(self, file_id: str):
+        """
+        Download a file from Google Drive into memory
+        
+        Args:
+            file_id: Google Drive file ID
+            
+        Returns:
+            io.BytesIO positioned at the start of the file content
+        """
+        try:
+            buffer = io.BytesIO()
+            self._stream_media(file_id, buffer)
+            buffer.seek(0)
+            return buffer
+            
+        except Exception as e:
+            raise Exception(f"Error downloading file {file_id}: {str(e)}")
+    
     def get_folder_metadata(self, folder_id: str):
         """
         Get metadata for a specific folder
@@ -232,7 +364,7 @@ class GoogleDriveClient:
             folder = self.service.files().get(
                 fileId=folder_id,
                 fields="id, name, mimeType, createdTime"
-            ).execute()
+            ).execute(http=self._thread_http())
             return folder
         except Exception as e:
             raise Exception(f"Error getting folder metadata: {str(e)}")
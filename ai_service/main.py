@@ -5,18 +5,76 @@ Handles file summarization requests from Django dashboard
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict
+import asyncio
 import os
+import threading
+import anyio
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from .drive_client import GoogleDriveClient
-from .parsers import extract_text_from_file
-from .summarizer import summarize_text
+from .drive_client import GoogleDriveClient, get_token_path
+from .parsers import iter_text_from_stream
+from .summarizer import summarize_pages
 
 app = FastAPI(title="AI Summarizer Service")
 
+# Maximum number of files processed concurrently per request
+SUMMARIZE_CONCURRENCY = int(os.getenv("SUMMARIZE_CONCURRENCY", "8"))
+
+# Files larger than this are downloaded to disk instead of into memory
+MAX_BUFFER_BYTES = int(os.getenv("MAX_BUFFER_BYTES", str(100 * 1024 * 1024)))
+
+# Maximum Drive API calls in flight across all requests
+DRIVE_MAX_IN_FLIGHT = int(os.getenv("DRIVE_MAX_IN_FLIGHT", "16"))
+
+# Created on first use, inside the event loop
+_drive_limiter = None
+
+# Drive client shared across requests, rebuilt when the token file changes
+_drive_client = None
+_drive_client_mtime = None
+_drive_client_lock = threading.Lock()
+
+
+def _token_mtime():
+    """Modification time of the saved OAuth token, or None if missing"""
+    token_path = get_token_path()
+    return os.path.getmtime(token_path) if os.path.exists(token_path) else None
+
+
+def get_drive_client() -> GoogleDriveClient:
+    """
+    Get the shared Google Drive client
+    
+    Reuses the authenticated service (and its discovery document) across
+    requests. The client is rebuilt after re-authentication.
+    
+    Returns:
+        Authenticated GoogleDriveClient
+    """
+    global _drive_client, _drive_client_mtime
+    with _drive_client_lock:
+        if _drive_client is None or _token_mtime() != _drive_client_mtime:
+            _drive_client = GoogleDriveClient()
+            # Read after construction, which may have saved refreshed credentials
+            _drive_client_mtime = _token_mtime()
+        return _drive_client
+
+
+async def _run_drive(func, *args):
+    """
+    Run a blocking Drive call in a worker thread
+    
+    Calls from all requests share one capacity limiter, so concurrent
+    requests can't multiply the number of Drive calls in flight.
+    """
+    global _drive_limiter
+    if _drive_limiter is None:
+        _drive_limiter = anyio.CapacityLimiter(DRIVE_MAX_IN_FLIGHT)
+    return await anyio.to_thread.run_sync(lambda: func(*args), limiter=_drive_limiter)
+
 
 class SummarizeRequest(BaseModel):
     """Request model for summarization"""
@@ -30,6 +88,85 @@ class SummarizeResponse(BaseModel):
     total_files: int
 
 
+def _extract_via_disk(drive_client: GoogleDriveClient, file_info: Dict) -> List[str]:
+    """
+    Download a file to disk, extract its text and remove it again
+    
+    Used for files too large to hold in memory.
+    
+    Args:
+        drive_client: Authenticated Google Drive client
+        file_info: File metadata from the folder listing
+        
+    Returns:
+        Extracted text, one item per page for PDFs
+    """
+    # Download into a per-file directory so same-named files don't collide
+    download_dir = os.path.join('temp_downloads', file_info['id'])
+    file_path = drive_client.download_file(
+        file_info['id'],
+        file_info['name'],
+        download_dir
+    )
+    
+    try:
+        _, ext = os.path.splitext(file_path)
+        with open(file_path, 'rb') as fh:
+            return list(iter_text_from_stream(fh, ext))
+    finally:
+        # Clean up downloaded file
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        if os.path.isdir(download_dir) and not os.listdir(download_dir):
+            os.rmdir(download_dir)
+
+
+async def _process_one(drive_client: GoogleDriveClient, file_info: Dict) -> Dict:
+    """
+    Download, extract and summarize a single file
+    
+    Blocking SDK calls run in worker threads so several files can be
+    processed at the same time.
+    
+    Args:
+        drive_client: Authenticated Google Drive client
+        file_info: File metadata from the folder listing
+        
+    Returns:
+        Result dictionary for the file
+    """
+    try:
+        if int(file_info.get('size') or 0) <= MAX_BUFFER_BYTES:
+            # Small enough to parse straight from memory
+            _, ext = os.path.splitext(file_info['name'])
+            buffer = await _run_drive(drive_client.download_to_buffer, file_info['id'])
+            pages = iter_text_from_stream(buffer, ext)
+        else:
+            pages = await _run_drive(_extract_via_disk, drive_client, file_info)
+        
+        # Generate summary; in-memory pages are parsed as they are summarized
+        summary = await asyncio.to_thread(summarize_pages, pages, file_info['name'])
+        
+        return {
+            'id': file_info['id'],
+            'name': file_info['name'],
+            'type': file_info.get('mimeType', ''),
+            'size': file_info.get('size', 'N/A'),
+            'summary': summary,
+            'status': 'success'
+        }
+        
+    except Exception as e:
+        return {
+            'id': file_info.get('id', ''),
+            'name': file_info['name'],
+            'type': file_info.get('mimeType', ''),
+            'size': file_info.get('size', 'N/A'),
+            'summary': f'Error processing file: {str(e)}',
+            'status': 'error'
+        }
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -48,63 +185,58 @@ async def summarize_files(request: SummarizeRequest):
         List of file summaries with metadata
     """
     try:
-        # Initialize Google Drive client
-        drive_client = GoogleDriveClient()
+        # Get shared Google Drive client (may read the token file and refresh)
+        drive_client = await asyncio.to_thread(get_drive_client)
         
         # Get files from folder
-        files = drive_client.list_files_in_folder(
+        files = await _run_drive(
+            drive_client.list_files_in_folder,
             request.folder_id, 
-            file_types=request.file_types
+            request.file_types,
+            "files(id, name, mimeType, size, md5Checksum)"
         )
         
         if not files:
             return SummarizeResponse(files=[], total_files=0)
         
-        results = []
+        # Bound the number of files in flight at once
+        semaphore = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+        
+        async def _guarded(file_info):
+            async with semaphore:
+                return await _process_one(drive_client, file_info)
+        
+        # Group identical content so each copy is processed only once;
+        # files without a checksum (e.g. Google Docs) stand alone
+        groups = {}
+        for file_info in files:
+            key = file_info.get('md5Checksum') or file_info['id']
+            groups.setdefault(key, []).append(file_info)
+        
+        # Process one file per group concurrently
+        keys = list(groups)
+        processed = await asyncio.gather(*[_guarded(groups[key][0]) for key in keys])
         
-        # Process each file
+        # Fan each result out to every copy, keeping the listing order
+        by_key = dict(zip(keys, processed))
+        results = []
         for file_info in files:
-            try:
-                # Download file
-                file_path = drive_client.download_file(
-                    file_info['id'], 
-                    file_info['name']
-                )
-                
-                # Extract text
-                text = extract_text_from_file(file_path)
-                
-                # Generate summary
-                summary = summarize_text(text, file_info['name'])
-                
-                results.append({
-                    'id': file_info['id'],
-                    'name': file_info['name'],
-                    'type': file_info.get('mimeType', ''),
-                    'size': file_info.get('size', 'N/A'),
-                    'summary': summary,
-                    'status': 'success'
-                })
-                
-                # Clean up downloaded file
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    
-            except Exception as e:
-                results.append({
-                    'id': file_info.get('id', ''),
-                    'name': file_info['name'],
-                    'type': file_info.get('mimeType', ''),
-                    'size': file_info.get('size', 'N/A'),
-                    'summary': f'Error processing file: {str(e)}',
-                    'status': 'error'
-                })
+            result = dict(by_key[file_info.get('md5Checksum') or file_info['id']])
+            result.update({
+                'id': file_info['id'],
+                'name': file_info['name'],
+                'type': file_info.get('mimeType', ''),
+                'size': file_info.get('size', 'N/A')
+            })
+            results.append(result)
         
         return SummarizeResponse(
             files=results,
             total_files=len(results)
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
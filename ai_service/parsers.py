@@ -3,10 +3,140 @@ Document Parsers
 Extract text content from various file formats (PDF, DOCX, TXT)
 """
 import os
-from typing import Optional
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Iterator, List, Optional
 import PyPDF2
 from docx import Document
 
+# Worker processes used to extract text from large PDFs
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', str(os.cpu_count() or 1)))
+
+# PDFs with fewer pages are parsed inline to avoid pool overhead
+PDF_PARALLEL_MIN_PAGES = 4
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Get the shared PDF worker pool, creating it on first use"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Forking while anyio/asyncio/sqlite threads run can copy held
+            # locks into the child, so start workers from a clean process
+            # (forkserver isn't available on Windows, spawn always is)
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                method = 'forkserver'
+            else:
+                method = 'spawn'
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _pdf_pool
+
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a broken worker pool so the next PDF gets a fresh one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False)
+
+
+def _extract_page_range(args) -> List[str]:
+    """Extract text from pages [start, end) of a PDF file on disk (runs in a worker)"""
+    file_path, start, end = args
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, end)]
+
+
+def _stream_path(stream: BinaryIO) -> Optional[str]:
+    """Path of the file backing a stream, or None for in-memory streams"""
+    name = getattr(stream, 'name', None)
+    return name if isinstance(name, str) and os.path.isfile(name) else None
+
+
+def _iter_pdf_pages(stream: BinaryIO) -> Iterator[str]:
+    """Yield the text of each non-empty page of an open PDF stream, in order"""
+    pdf_reader = PyPDF2.PdfReader(stream)
+    page_count = len(pdf_reader.pages)
+    
+    if PDF_WORKERS <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for page in pdf_reader.pages:
+            text = page.extract_text()
+            if text:
+                yield text
+    else:
+        # Workers open the file themselves, so only a path crosses the
+        # process boundary; in-memory PDFs are spilled to one temp file
+        file_path = _stream_path(stream)
+        temp_path = None
+        if file_path is None:
+            fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+            with os.fdopen(fd, 'wb') as temp_file:
+                stream.seek(0)
+                shutil.copyfileobj(stream, temp_file)
+            file_path = temp_path
+        
+        try:
+            # Split pages into one contiguous range per worker
+            step = -(-page_count // PDF_WORKERS)
+            ranges = [
+                (file_path, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ]
+            pool = _get_pdf_pool()
+            next_page = 0
+            try:
+                # map() returns batches in order as workers finish them
+                batches = pool.map(_extract_page_range, ranges)
+                for (_, _, end), batch in zip(ranges, batches):
+                    yield from (text for text in batch if text)
+                    next_page = end
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); replace the pool for later
+                # PDFs and finish this one inline
+                _discard_pdf_pool(pool)
+                for i in range(next_page, page_count):
+                    text = pdf_reader.pages[i].extract_text()
+                    if text:
+                        yield text
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def _read_pdf(stream: BinaryIO) -> str:
+    """Extract text from an open PDF stream"""
+    return "\n".join(_iter_pdf_pages(stream)).strip()
+
+
+def _read_docx(stream: BinaryIO) -> str:
+    """Extract text from an open DOCX stream"""
+    doc = Document(stream)
+    text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+    return text.strip()
+
+
+def _read_txt(stream: BinaryIO) -> str:
+    """Decode text from an open binary stream, falling back to latin-1"""
+    data = stream.read()
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Try alternative encoding if UTF-8 fails
+        text = data.decode('latin-1')
+    return text.strip()
+
 
 def extract_text_from_pdf(file_path: str) -> str:
     """
@@ -19,12 +149,8 @@ def extract_text_from_pdf(file_path: str) -> str:
         Extracted text content
     """
     try:
-        text = ""
         with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+            return _read_pdf(file)
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
@@ -40,9 +166,8 @@ def extract_text_from_docx(file_path: str) -> str:
         Extracted text content
     """
     try:
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
+        with open(file_path, 'rb') as file:
+            return _read_docx(file)
     except Exception as e:
         raise Exception(f"Error extracting text from DOCX: {str(e)}")
 
@@ -58,21 +183,57 @@ def extract_text_from_txt(file_path: str) -> str:
         Extracted text content
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
-        return text.strip()
-    except UnicodeDecodeError:
-        # Try alternative encoding if UTF-8 fails
-        try:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                text = file.read()
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"Error extracting text from TXT: {str(e)}")
+        with open(file_path, 'rb') as file:
+            return _read_txt(file)
     except Exception as e:
         raise Exception(f"Error extracting text from TXT: {str(e)}")
 
 
+# Extension -> (piece iterator over an open stream, label for errors)
+STREAM_PARSERS = {
+    '.pdf': (_iter_pdf_pages, 'PDF'),
+    '.docx': (lambda stream: [_read_docx(stream)], 'DOCX'),
+    '.txt': (lambda stream: [_read_txt(stream)], 'TXT'),
+}
+
+
+def iter_text_from_stream(stream: BinaryIO, ext: str) -> Iterator[str]:
+    """
+    Yield text from an in-memory file piece by piece based on extension
+    
+    PDFs yield one item per page so callers can process long documents
+    incrementally; other formats yield their whole text once.
+    
+    Args:
+        stream: Binary stream positioned at the start of the file
+        ext: File extension including the dot (e.g., '.pdf')
+        
+    Yields:
+        Extracted text, in document order
+        
+    Raises:
+        ValueError: If file type is not supported
+    """
+    # Route to appropriate parser
+    ext = ext.lower()
+    if ext not in STREAM_PARSERS:
+        raise ValueError(f"Unsupported file type: {ext}")
+    pieces, label = STREAM_PARSERS[ext]
+    
+    try:
+        yield from pieces(stream)
+    except Exception as e:
+        raise Exception(f"Error extracting text from {label}: {str(e)}")
+
+
+# Extension -> path-based parser
+FILE_PARSERS = {
+    '.pdf': extract_text_from_pdf,
+    '.docx': extract_text_from_docx,
+    '.txt': extract_text_from_txt,
+}
+
+
 def extract_text_from_file(file_path: str) -> str:
     """
     Extract text from file based on extension
@@ -94,14 +255,9 @@ def extract_text_from_file(file_path: str) -> str:
     ext = ext.lower()
     
     # Route to appropriate parser
-    if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif ext == '.docx':
-        return extract_text_from_docx(file_path)
-    elif ext == '.txt':
-        return extract_text_from_txt(file_path)
-    else:
+    if ext not in FILE_PARSERS:
         raise ValueError(f"Unsupported file type: {ext}")
+    return FILE_PARSERS[ext](file_path)
 
 
 def validate_text_content(text: str, min_length: int = 10) -> bool:
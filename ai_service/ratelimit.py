@@ -0,0 +1,78 @@
+"""
+Rate Limiter
+Token-bucket limiter shared by concurrent AI API callers
+"""
+import os
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    Dual token bucket enforcing requests-per-minute and tokens-per-minute
+
+    Both buckets start full and refill continuously at their per-minute
+    rate. A call to acquire() blocks until one request slot and the
+    estimated number of tokens are both available.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Maximum API requests per minute
+            tokens_per_minute: Maximum prompt + completion tokens per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.request_tokens = float(requests_per_minute)
+        self.token_tokens = float(tokens_per_minute)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Add capacity for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.request_tokens = min(
+            self.requests_per_minute,
+            self.request_tokens + elapsed * self.requests_per_minute / 60.0
+        )
+        self.token_tokens = min(
+            self.tokens_per_minute,
+            self.token_tokens + elapsed * self.tokens_per_minute / 60.0
+        )
+
+    def acquire(self, estimated_tokens: int):
+        """
+        Block until a request with the given token estimate may be sent
+
+        Args:
+            estimated_tokens: Expected prompt + completion tokens for the request
+        """
+        # A single request can never need more than a full bucket
+        needed = min(float(estimated_tokens), float(self.tokens_per_minute))
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self.request_tokens >= 1 and self.token_tokens >= needed:
+                    self.request_tokens -= 1
+                    self.token_tokens -= needed
+                    return
+
+                # Sleep until the scarcer bucket has refilled enough
+                wait_requests = (1 - self.request_tokens) * 60.0 / self.requests_per_minute
+                wait_tokens = (needed - self.token_tokens) * 60.0 / self.tokens_per_minute
+                wait = max(wait_requests, wait_tokens, 0.01)
+
+            time.sleep(wait)
+
+
+# Shared limiter for all summarization calls in this process
+LIMITER = TokenBucket(
+    requests_per_minute=int(os.getenv('GEMINI_RPM', '60')),
+    tokens_per_minute=int(os.getenv('GEMINI_TPM', '1000000'))
+)
@@ -1,16 +1,106 @@
 import os
+import re
 import google.generativeai as genai
 
+from .cache import make_key, get_summary, set_summary
+from .ratelimit import LIMITER
+
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
-model = genai.GenerativeModel("gemini-2.0-flash-exp")
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+model = genai.GenerativeModel(MODEL_NAME)
+
+# Input context window of the model, in tokens
+CONTEXT_TOKENS = int(os.getenv("GEMINI_CONTEXT_TOKENS", "1048576"))
+
+# Tokens reserved for the instruction part of the prompt
+PROMPT_OVERHEAD_TOKENS = 64
+
+# Documents shorter than this are returned as-is instead of summarized
+SHORT_TEXT_CHARS = 400
+
+def get_token_estimate(text: str) -> int:
+    # Rough estimate: ~4 characters per token
+    return len(text) // 4
+
+def count_tokens(text: str) -> int:
+    # Exact count from the model's own tokenizer (one API round trip)
+    return model.count_tokens(text).total_tokens
+
+def truncate_to_budget(text: str, budget: int):
+    # The estimate can be off by ~2x for code/CJK, so only pay for an
+    # exact count when the text might actually exceed the budget
+    estimate = get_token_estimate(text)
+    if estimate * 2 < budget:
+        return text, estimate
+
+    tokens = count_tokens(text)
+    while tokens > budget:
+        text = text[:int(len(text) * budget / tokens * 0.95)]
+        tokens = count_tokens(text)
+    return text, tokens
+
+def normalize_whitespace(text: str) -> str:
+    # Collapse whitespace runs (common in PDFs) so they don't inflate the
+    # token count, and so trivially different copies share a cache entry
+    return re.sub(r"\s+", " ", text).strip()
 
 def summarize_text(text: str, filename: str = "", max_tokens: int = 500) -> str:
+    text = normalize_whitespace(text)
+
+    key = make_key(text, MODEL_NAME, max_tokens)
+    cached = get_summary(key)
+    if cached is not None:
+        return cached
+
+    budget = CONTEXT_TOKENS - max_tokens - PROMPT_OVERHEAD_TOKENS
+    text, text_tokens = truncate_to_budget(text, budget)
+
     prompt = (
         "Summarize the following document in 5 to 10 clear sentences. "
         "Focus on key ideas only.\n\n"
         f"{text}"
     )
 
+    LIMITER.acquire(text_tokens + PROMPT_OVERHEAD_TOKENS + max_tokens)
     response = model.generate_content(prompt)
-    return response.text.strip()
+    summary = response.text.strip()
+
+    set_summary(key, summary, MODEL_NAME)
+    return summary
+
+def summarize_pages(pages, filename: str = "", max_tokens: int = 500) -> str:
+    # Map-reduce over page windows: documents that fit the context are
+    # summarized in one call, longer ones window by window and then the
+    # window summaries are summarized. Pages are consumed lazily, so only
+    # the current window is held in memory.
+    budget = CONTEXT_TOKENS - max_tokens - PROMPT_OVERHEAD_TOKENS
+    summaries = []
+    window = []
+    window_tokens = 0
+
+    for page in pages:
+        page_tokens = get_token_estimate(page)
+        if window and window_tokens + page_tokens > budget:
+            summaries.append(summarize_text("\n".join(window).strip(), filename, max_tokens))
+            window = []
+            window_tokens = 0
+        window.append(page)
+        window_tokens += page_tokens
+
+    text = "\n".join(window).strip()
+    if not summaries:
+        # Short single-window documents are their own summary; the check
+        # lives here so the reduce step below always reaches the model
+        short_text = normalize_whitespace(text)
+        if not short_text:
+            # e.g. scanned/image-only PDFs or blank files
+            raise ValueError("No extractable text")
+        if len(short_text) < SHORT_TEXT_CHARS:
+            return short_text
+        return summarize_text(text, filename, max_tokens)
+
+    if text:
+        summaries.append(summarize_text(text, filename, max_tokens))
+    return summarize_text("\n\n".join(summaries), filename, max_tokens)
@@ -0,0 +1,19 @@
+"""
+Dashboard Middleware
+Response compression for the dashboard
+"""
+from django.middleware.gzip import GZipMiddleware
+
+
+# Content types that are already compressed internally
+PRECOMPRESSED_TYPES = ('application/pdf',)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip responses, skipping content types that wouldn't shrink further"""
+    
+    def process_response(self, request, response):
+        # ReportLab already Flate-compresses PDF page streams
+        if response.get('Content-Type', '').startswith(PRECOMPRESSED_TYPES):
+            return response
+        return super().process_response(request, response)
@@ -3,35 +3,195 @@ Dashboard Views
 Handles UI rendering and communication with FastAPI service
 """
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import (
+    FileResponse, JsonResponse, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+)
 from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.http import require_http_methods
-from django.views.decorators.csrf import csrf_exempt
-import requests
+from asgiref.sync import sync_to_async
+import httpx
+import orjson
 import csv
-import json
 import os
-from io import StringIO, BytesIO
-import sys
+import uuid
+import hashlib
+import tempfile
+import time
+from collections import Counter
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.units import inch
-from datetime import datetime
+from xml.sax.saxutils import escape
 
-# Add ai_service to path
-sys.path.append(os.path.join(settings.BASE_DIR, 'ai_service'))
-from ai_service.drive_client import GoogleDriveClient
+from ai_service.drive_client import GoogleDriveClient, get_token_path
+
+# Resolved once per process
+_TOKEN_PATH = get_token_path()
+_FOLDER_ID = os.getenv('GOOGLE_DRIVE_FOLDER_ID', '')
+
+# Seconds the dashboard's authentication check is cached
+AUTH_STATE_TTL = 5
+
+# Google Drive file view URL, around the file ID
+DRIVE_FILE_URL_PREFIX = 'https://drive.google.com/file/d/'
+DRIVE_FILE_URL_SUFFIX = '/view'
+
+# How long summarize results stay available for CSV/PDF download
+RESULTS_TTL = 3600
+
+# How long identical summarize requests are answered from the cache
+SUMMARIZE_MEMO_TTL = 300
+
+# Upper bound on file types accepted in one summarize request
+MAX_FILE_TYPES = 16
+
+# CSV export columns: (header, result key)
+CSV_COLUMNS = (
+    ('File Name', 'name'),
+    ('Type', 'type'),
+    ('Size', 'size'),
+    ('Summary', 'summary'),
+    ('File URL', 'url'),
+    ('Status', 'status'),
+)
+
+# PDF reports larger than this are rendered to a temporary file on disk
+PDF_SPOOL_MAX_BYTES = 5 * 1024 * 1024
+
+# PDF report styles, built once at import
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#667eea'),
+    spaceAfter=30,
+    alignment=1  # Center
+)
+# Wrapping text inside file table cells
+_CELL_STYLE = ParagraphStyle(
+    'Cell',
+    parent=_STYLES['Normal'],
+    fontSize=9,
+    leading=12
+)
+_STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('TOPPADDING', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+])
+
+_FILES_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('FONTNAME', (2, 1), (2, -1), 'Helvetica-Bold'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# AsyncClient shared by requests under ASGI, where all of them run on
+# one long-lived event loop
+_shared_http_client = None
+
+
+def _new_http_client():
+    """Create an AsyncClient for calls to the FastAPI service"""
+    # Keep-alive pool; connection failures are retried, but the POST
+    # itself is not since summarization is expensive to repeat
+    transport = httpx.AsyncHTTPTransport(
+        retries=2,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=16)
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=300  # 5 minute timeout for large folders
+    )
+
+
+async def _post_to_fastapi(request, url, **kwargs):
+    """
+    POST to the FastAPI service
+    
+    Under ASGI the pooled client is reused across requests. Under WSGI
+    each async view runs on its own short-lived event loop, so a client
+    is created and closed per call rather than leaked with its sockets.
+    """
+    global _shared_http_client
+    if isinstance(request, ASGIRequest):
+        if _shared_http_client is None:
+            _shared_http_client = _new_http_client()
+        return await _shared_http_client.post(url, **kwargs)
+    
+    async with _new_http_client() as client:
+        return await client.post(url, **kwargs)
+
+
+class Echo:
+    """File-like object that returns written values, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+
+class ORJSONResponse(HttpResponse):
+    """JSON response serialized with orjson, which is much faster on large payloads"""
+    
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(orjson.dumps(data), **kwargs)
+
+
+def _store_results(request, result):
+    """Store results in the cache and keep only a handle in the session"""
+    results_id = uuid.uuid4().hex
+    cache.set(f'sum:{results_id}', result, timeout=RESULTS_TTL)
+    request.session['last_results_id'] = results_id
+    return results_id
+
+
+def _remember_results(request, results_id):
+    """Point the session at results that are already cached"""
+    request.session['last_results_id'] = results_id
+
+
+def _load_results(request):
+    """Get the results of the last summarize request, or None if expired"""
+    results_id = request.session.get('last_results_id')
+    if not results_id:
+        return None
+    return cache.get(f'sum:{results_id}')
+
+
+@lru_cache(maxsize=1)
+def _auth_state(epoch):
+    """Whether a saved token exists; cached per AUTH_STATE_TTL-second epoch"""
+    return os.path.exists(_TOKEN_PATH)
 
 
 def index(request):
     """Render main dashboard page"""
     # Check if user is authenticated with Google
-    is_authenticated = os.path.exists(os.getenv('GOOGLE_DRIVE_TOKEN_PATH', 'token.pickle'))
+    is_authenticated = _auth_state(int(time.monotonic() // AUTH_STATE_TTL))
     context = {
         'is_authenticated': is_authenticated,
-        'folder_id': os.getenv('GOOGLE_DRIVE_FOLDER_ID', '')
+        'folder_id': _FOLDER_ID
     }
     return render(request, 'dashboard/index.html', context)
 
@@ -68,6 +228,9 @@ def oauth_callback(request):
             state
         )
         
+        # Token file now exists; don't wait for the cached check to expire
+        _auth_state.cache_clear()
+        
         # Clear state from session
         if 'oauth_state' in request.session:
             del request.session['oauth_state']
@@ -79,16 +242,19 @@ def oauth_callback(request):
         return HttpResponse(f'OAuth callback error: {str(e)}', status=500)
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def summarize(request):
+async def summarize(request):
     """
     Handle summarization request
     Forwards request to FastAPI service and returns results
+    
+    Async so the worker is free while FastAPI processes the folder.
     """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    
     try:
         # Get parameters from request
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         folder_id = data.get('folder_id')
         file_types = data.get('file_types', ['pdf', 'docx', 'txt'])
         
@@ -97,40 +263,72 @@ def summarize(request):
                 'error': 'folder_id is required'
             }, status=400)
         
+        # All requested types go upstream together in a single call
+        if (not isinstance(file_types, list)
+                or not 1 <= len(file_types) <= MAX_FILE_TYPES
+                or not all(isinstance(t, str) for t in file_types)):
+            return JsonResponse({
+                'error': f'file_types must be a list of 1 to {MAX_FILE_TYPES} strings'
+            }, status=400)
+        file_types = sorted({t.lower() for t in file_types})
+        
+        # Reuse a recent result for the same folder and types (?nocache=1 bypasses)
+        memo_key = 'summarize:' + hashlib.blake2b(
+            f'{folder_id}|{",".join(file_types)}'.encode(), digest_size=16
+        ).hexdigest()
+        if request.GET.get('nocache') != '1':
+            # The memo holds only the results id, so a hit shares the
+            # stored payload instead of caching another copy
+            results_id = await cache.aget(memo_key)
+            cached = await cache.aget(f'sum:{results_id}') if results_id else None
+            if cached is not None:
+                await sync_to_async(_remember_results)(request, results_id)
+                return ORJSONResponse(cached)
+        
         # Call FastAPI service
         fastapi_url = f"{settings.FASTAPI_SERVICE_URL}/summarize"
         
-        response = requests.post(
+        response = await _post_to_fastapi(
+            request,
             fastapi_url,
-            json={
+            content=orjson.dumps({
                 'folder_id': folder_id,
                 'file_types': file_types
-            },
-            timeout=300  # 5 minute timeout for large folders
+            }),
+            headers={'Content-Type': 'application/json'}
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
+            # Drop the raw body before the reply is serialized, so the
+            # payload isn't held three times (raw, parsed, re-encoded)
+            del response
             
             # Add Google Drive URLs to each file
-            for file_data in result.get('files', []):
-                if 'id' in file_data:
-                    file_data['url'] = f"https://drive.google.com/file/d/{file_data['id']}/view"
+            prefix, suffix = DRIVE_FILE_URL_PREFIX, DRIVE_FILE_URL_SUFFIX
+            for file_data in result.get('files', ()):
+                file_id = file_data.get('id')
+                if file_id:
+                    file_data['url'] = prefix + file_id + suffix
             
-            # Store results in session for CSV/PDF download
-            request.session['last_results'] = result
+            # Store results for CSV/PDF download and repeat requests
+            results_id = await sync_to_async(_store_results)(request, result)
+            # Failed files (quota, transient Drive errors) should be retried
+            # on the next click, so only fully successful runs are memoized
+            if not any(f.get('status') == 'error' for f in result.get('files', ())):
+                await cache.aset(memo_key, results_id, timeout=SUMMARIZE_MEMO_TTL)
             
-            return JsonResponse(result)
+            return ORJSONResponse(result)
         else:
             return JsonResponse({
                 'error': f'FastAPI service error: {response.text}'
             }, status=response.status_code)
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return JsonResponse({
             'error': 'Cannot connect to AI service. Make sure FastAPI is running.'
         }, status=503)
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         return JsonResponse({
             'error': 'Request timeout. The folder may be too large.'
         }, status=504)
@@ -140,15 +338,19 @@ def summarize(request):
         }, status=500)
 
 
+# Django 4.2's csrf_exempt decorator does not support async views
+summarize.csrf_exempt = True
+
+
 @require_http_methods(["GET"])
 def download_csv(request):
     """
     Download results as CSV file
-    Uses data stored in session from last summarize request
+    Uses results cached by the last summarize request
     """
     try:
-        # Get results from session
-        results = request.session.get('last_results')
+        # Get results from last summarize request
+        results = _load_results(request)
         
         if not results:
             return HttpResponse(
@@ -156,29 +358,30 @@ def download_csv(request):
                 status=400
             )
         
-        # Create CSV
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # Write header
-        writer.writerow(['File Name', 'Type', 'Size', 'Summary', 'File URL', 'Status'])
+        # Nothing to export; skip building the file entirely
+        files = results.get('files') or []
+        if not files:
+            return HttpResponse(status=204)
         
-        # Write data rows
-        for file_data in results.get('files', []):
-            writer.writerow([
-                file_data.get('name', ''),
-                file_data.get('type', ''),
-                file_data.get('size', ''),
-                file_data.get('summary', ''),
-                file_data.get('url', ''),
-                file_data.get('status', '')
-            ])
+        # Stream rows one at a time instead of building the whole file
+        writer = csv.writer(Echo())
         
-        # Create response
-        response = HttpResponse(output.getvalue(), content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="summaries.csv"'
-        
-        return response
+        def rows():
+            # Write header
+            yield writer.writerow([header for header, _ in CSV_COLUMNS])
+            
+            # Write data rows
+            keys = [key for _, key in CSV_COLUMNS]
+            writerow = writer.writerow
+            for file_data in files:
+                get = file_data.get
+                yield writerow([get(key, '') for key in keys])
+        
+        return StreamingHttpResponse(
+            rows(),
+            content_type='text/csv',
+            headers={'Content-Disposition': 'attachment; filename="summaries.csv"'}
+        )
         
     except Exception as e:
         return HttpResponse(
@@ -191,11 +394,11 @@ def download_csv(request):
 def download_pdf(request):
     """
     Download results as PDF file
-    Uses data stored in session from last summarize request
+    Uses results cached by the last summarize request
     """
     try:
-        # Get results from session
-        results = request.session.get('last_results')
+        # Get results from last summarize request
+        results = _load_results(request)
         
         if not results:
             return HttpResponse(
@@ -203,36 +406,36 @@ def download_pdf(request):
                 status=400
             )
         
-        # Create PDF in memory
-        buffer = BytesIO()
+        # Nothing to export; skip building the file entirely
+        files = results.get('files') or []
+        if not files:
+            return HttpResponse(status=204)
+        
+        # One timestamp for both the report body and the file name
+        generated_at = time.localtime()
+        
+        # Create PDF in memory, spilling to disk for large reports
+        buffer = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
         doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
         
         # Container for PDF elements
         elements = []
         
         # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#667eea'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-        heading_style = styles['Heading2']
-        normal_style = styles['Normal']
+        title_style = _TITLE_STYLE
+        heading_style = _STYLES['Heading2']
+        normal_style = _STYLES['Normal']
         
         # Title
         elements.append(Paragraph('Google Drive AI Summarizer Report', title_style))
-        elements.append(Paragraph(f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', normal_style))
+        elements.append(Paragraph(f'Generated: {time.strftime("%Y-%m-%d %H:%M:%S", generated_at)}', normal_style))
         elements.append(Spacer(1, 0.3*inch))
         
         # Summary statistics
-        files = results.get('files', [])
         total = len(files)
-        successful = len([f for f in files if f.get('status') == 'success'])
-        errors = len([f for f in files if f.get('status') == 'error'])
+        status_counts = Counter(f.get('status') for f in files)
+        successful = status_counts['success']
+        errors = status_counts['error']
         
         stats_data = [
             ['Total Files', 'Successful', 'Errors'],
@@ -240,19 +443,7 @@ def download_pdf(request):
         ]
         
         stats_table = Table(stats_data, colWidths=[2*inch, 2*inch, 2*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#667eea')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
+        stats_table.setStyle(_STATS_TABLE_STYLE)
         
         elements.append(stats_table)
         elements.append(Spacer(1, 0.4*inch))
@@ -261,62 +452,48 @@ def download_pdf(request):
         elements.append(Paragraph('File Summaries', heading_style))
         elements.append(Spacer(1, 0.2*inch))
         
-        # Process each file
+        # One table for all files; ReportLab splits it across pages, repeats
+        # the header row, and splits rows taller than a page
+        rows = [['#', 'File', 'Status', 'Summary']]
+        status_colors = []
         for idx, file_data in enumerate(files, 1):
-            # File header
-            file_name = file_data.get('name', 'Unknown')
+            file_name = escape(file_data.get('name', 'Unknown'))
             file_type = file_data.get('type', '').split('/')[-1]
             status = file_data.get('status', 'unknown')
             
-            # Create file info paragraph
-            file_header = f"<b>{idx}. {file_name}</b> ({file_type})"
-            elements.append(Paragraph(file_header, normal_style))
-            elements.append(Spacer(1, 0.1*inch))
-            
-            # Status
-            status_color = '#155724' if status == 'success' else '#721c24'
-            status_text = f'<font color="{status_color}"><b>Status:</b> {status.upper()}</font>'
-            elements.append(Paragraph(status_text, normal_style))
-            elements.append(Spacer(1, 0.05*inch))
-            
-            # File URL (if available)
+            # Link the file name to Drive when a URL is available
             if 'url' in file_data:
-                url_text = f'<b>Link:</b> <link href="{file_data["url"]}" color="blue">{file_data["url"]}</link>'
-                elements.append(Paragraph(url_text, normal_style))
-                elements.append(Spacer(1, 0.05*inch))
+                file_name = f'<link href="{escape(file_data["url"])}" color="blue">{file_name}</link>'
+            file_cell = Paragraph(f'{file_name}<br/>({escape(file_type)})', _CELL_STYLE)
             
-            # Summary
             summary = file_data.get('summary', 'No summary available')
-            # Wrap text to prevent overflow
-            summary_style = ParagraphStyle(
-                'Summary',
-                parent=normal_style,
-                fontSize=9,
-                leading=12,
-                leftIndent=20,
-                rightIndent=20,
-                spaceAfter=10
-            )
-            elements.append(Paragraph(f'<b>Summary:</b>', normal_style))
-            elements.append(Paragraph(summary, summary_style))
-            elements.append(Spacer(1, 0.2*inch))
+            summary_cell = Paragraph(escape(summary), _CELL_STYLE)
             
-            # Add page break after every 3 files for better readability
-            if idx % 3 == 0 and idx < len(files):
-                elements.append(PageBreak())
+            rows.append([str(idx), file_cell, status.upper(), summary_cell])
+            status_color = '#155724' if status == 'success' else '#721c24'
+            status_colors.append(('TEXTCOLOR', (2, idx), (2, idx), colors.HexColor(status_color)))
+        
+        files_table = Table(
+            rows,
+            colWidths=[0.3*inch, 2*inch, 0.8*inch, 3.4*inch],
+            repeatRows=1,
+            splitInRow=1
+        )
+        files_table.setStyle(_FILES_TABLE_STYLE)
+        files_table.setStyle(TableStyle(status_colors))
+        elements.append(files_table)
         
         # Build PDF
         doc.build(elements)
         
-        # Get PDF from buffer
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        
-        # Create response
-        response = HttpResponse(pdf_data, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="summaries_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf"'
-        
-        return response
+        # Stream the rendered file; FileResponse closes the buffer when done
+        buffer.seek(0)
+        return FileResponse(
+            buffer,
+            as_attachment=True,
+            filename=f'summaries_{time.strftime("%Y%m%d_%H%M%S", generated_at)}.pdf',
+            content_type='application/pdf'
+        )
         
     except Exception as e:
         return HttpResponse(